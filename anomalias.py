@@ -0,0 +1,94 @@
+import os
+from typing import IO
+
+import numpy as np
+import pandas as pd
+
+# Histórico de rateios: uma linha por prédio, período e apartamento
+HISTORICO_FILE = os.environ.get("HISTORICO_FILE", "historico.csv")
+
+COL_PREDIO = "Prédio"
+COL_PERIODO = "Período"
+COL_APARTAMENTO = "Apartamento"
+COL_VALOR = "Valor Total (R$)"
+
+JANELA_PADRAO = 12
+LIMIAR_PADRAO = 3.0
+
+# Desvios e diferenças abaixo de meio centavo contam como zero
+TOLERANCIA = 0.005
+
+
+def carregar_historico(caminho: str | IO[bytes] = HISTORICO_FILE) -> pd.DataFrame:
+    """Load the billing history CSV; returns an empty frame if it doesn't exist.
+
+    Raises ValueError when the file lacks the expected columns.
+    """
+    if isinstance(caminho, str) and not os.path.exists(caminho):
+        return pd.DataFrame(
+            {
+                COL_PREDIO: pd.Series(dtype=object),
+                COL_PERIODO: pd.Series(dtype=object),
+                COL_APARTAMENTO: pd.Series(dtype=object),
+                COL_VALOR: pd.Series(dtype=float),
+            }
+        )
+    # pyrefly: ignore  # no-matching-overload
+    return pd.read_csv(
+        caminho,
+        dtype={COL_PREDIO: str, COL_PERIODO: str, COL_APARTAMENTO: str},
+        usecols=[COL_PREDIO, COL_PERIODO, COL_APARTAMENTO, COL_VALOR],
+    )
+
+
+def _marcar(
+    df: pd.DataFrame, chaves: list[str], janela: int, limiar: float
+) -> pd.DataFrame:
+    df = df.sort_values(chaves + [COL_PERIODO], kind="stable").reset_index(drop=True)
+    # estatísticas dos períodos anteriores (shift) para o próprio valor não
+    # mascarar o desvio; groupby().rolling() roda vetorizado em todos os grupos
+    anterior = df.groupby(chaves, sort=False)[COL_VALOR].shift(1)
+    janelas = anterior.groupby([df[c] for c in chaves], sort=False).rolling(
+        janela, min_periods=max(2, janela // 2)
+    )
+    media = janelas.mean().reset_index(level=list(range(len(chaves))), drop=True)
+    desvio = janelas.std().reset_index(level=list(range(len(chaves))), drop=True)
+
+    df["Média Móvel"] = media.round(2)
+    df["Desvio Padrão"] = desvio.round(2)
+    diferenca = df[COL_VALOR] - media
+    # histórico constante: qualquer mudança é anômala (z = ±inf)
+    plano = desvio < TOLERANCIA
+    salto = np.copysign(np.inf, diferenca).where(diferenca.abs() > TOLERANCIA, 0.0)
+    z = (diferenca / desvio.where(~plano)).mask(plano, salto)
+    df["Z-Score"] = z.round(2)
+    df["Anomalia"] = df["Z-Score"].abs() > limiar
+    return df
+
+
+def detectar_anomalias(
+    historico: pd.DataFrame,
+    janela: int = JANELA_PADRAO,
+    limiar: float = LIMIAR_PADRAO,
+) -> dict[str, pd.DataFrame]:
+    """Flag bills and apartment splits that deviate from their rolling history.
+
+    Returns the flagged rows for whole buildings ("predios", total of each bill)
+    and for individual apartments ("apartamentos").
+    """
+    por_predio = (
+        historico.groupby([COL_PREDIO, COL_PERIODO])[[COL_VALOR]].sum().reset_index()
+    )
+    predios = _marcar(por_predio, [COL_PREDIO], janela, limiar)
+    apartamentos = _marcar(
+        historico.filter(items=[COL_PREDIO, COL_PERIODO, COL_APARTAMENTO, COL_VALOR]),
+        [COL_PREDIO, COL_APARTAMENTO],
+        janela,
+        limiar,
+    )
+    return {
+        "predios": predios.loc[predios["Anomalia"]].reset_index(drop=True),
+        "apartamentos": apartamentos.loc[apartamentos["Anomalia"]].reset_index(
+            drop=True
+        ),
+    }
@@ -0,0 +1,323 @@
+import gzip
+import heapq
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from datetime import date, datetime, timezone
+from typing import Any, Iterator
+
+import numpy as np
+
+from rateio import ratear_lote
+
+# Diretório do log de auditoria (arquivos NDJSON compactados por dia UTC, um
+# segmento por gravador: auditoria-AAAA-MM-DD[-segmento].ndjson.gz)
+AUDITORIA_DIR = os.environ.get("AUDITORIA_DIR", "auditoria")
+
+TAMANHO_LOTE = 256  # registros por gravação
+INTERVALO_GRAVACAO = 1.0  # segundos máximos que um registro espera no lote
+MAX_PENDENTES = 10_000  # limite da fila; acima disso quem registra espera
+TIMEOUT_REGISTRO = 5.0
+PRAZO_ENCERRAMENTO = 10.0  # segundos tentando gravar após encerrar()
+TAMANHO_LOTE_RECONSTRUCAO = 4096  # contas recalculadas por chamada a ratear_lote
+
+_FIM = object()
+
+logger = logging.getLogger(__name__)
+
+
+class AuditoriaIndisponivel(Exception):
+    """The audit writer couldn't accept a record in time (queue full)."""
+
+
+PREFIXO = "auditoria-"
+SUFIXO = ".ndjson.gz"
+TAMANHO_LEITURA = 1 << 16
+
+
+def arquivo_do_dia(
+    dia: date, diretorio: str = AUDITORIA_DIR, segmento: str = ""
+) -> str:
+    nome = f"{dia.isoformat()}-{segmento}" if segmento else dia.isoformat()
+    return os.path.join(diretorio, f"{PREFIXO}{nome}{SUFIXO}")
+
+
+def novo_segmento() -> str:
+    # início (ns) e pid: segmentos do mesmo dia ordenam pela criação
+    return f"{time.time_ns()}-{os.getpid()}"
+
+
+def gravar_lote(
+    registros: list[dict[str, Any]],
+    diretorio: str = AUDITORIA_DIR,
+    segmento: str = "",
+) -> None:
+    """Append records to the daily files as new gzip members and fsync them."""
+    por_dia: dict[str, list[bytes]] = {}
+    for registro in registros:
+        dia = datetime.fromisoformat(registro["registrado_em"]).date()
+        linha = json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+        por_dia.setdefault(arquivo_do_dia(dia, diretorio, segmento), []).append(
+            linha.encode("utf-8") + b"\n"
+        )
+    os.makedirs(diretorio, exist_ok=True)
+    for caminho, linhas in por_dia.items():
+        # cada lote vira um membro gzip; um membro cortado por uma queda
+        # é pulado na leitura (ver _ler_membros)
+        with open(caminho, "ab") as f:
+            f.write(gzip.compress(b"".join(linhas)))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class GravadorAuditoria:
+    """Background writer that batches audit records into the append-only log.
+
+    Records are queued by the request threads and written by a single thread
+    when the batch reaches ``tamanho_lote`` or ``intervalo`` seconds pass.
+    The queue is bounded: when it is full, ``registrar`` blocks (backpressure)
+    and raises AuditoriaIndisponivel after ``TIMEOUT_REGISTRO`` seconds.
+    Records that can't be serialized are logged and dropped.
+
+    Each start writes to a new segment file, so a batch torn by a crash is
+    never followed by records of a later run.
+    """
+
+    def __init__(
+        self,
+        diretorio: str = AUDITORIA_DIR,
+        tamanho_lote: int = TAMANHO_LOTE,
+        intervalo: float = INTERVALO_GRAVACAO,
+        max_pendentes: int = MAX_PENDENTES,
+    ):
+        self.diretorio = diretorio
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.max_pendentes = max_pendentes
+        self._fila: queue.Queue[Any] = queue.Queue(max_pendentes)
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._desistir_em = float("inf")
+        self._segmento = ""
+
+    def iniciar(self) -> None:
+        with self._lock:
+            mesmo_processo = self._pid == os.getpid()
+            if self._thread is not None and mesmo_processo and self._thread.is_alive():
+                return
+            if not mesmo_processo:
+                # após um fork a thread do processo pai não existe no filho;
+                # no mesmo processo a fila é mantida com o que estava pendente
+                self._fila = queue.Queue(self.max_pendentes)
+            self._desistir_em = float("inf")
+            self._segmento = novo_segmento()
+            self._thread = threading.Thread(
+                target=self._executar, name="auditoria", daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def encerrar(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            # com o disco falhando, o encerramento não espera indefinidamente
+            self._desistir_em = time.monotonic() + PRAZO_ENCERRAMENTO
+            self._fila.put(_FIM)
+            thread.join()
+            self._thread = None
+
+    def registrar(self, registro: dict[str, Any]) -> None:
+        self.iniciar()
+        registro = {
+            "registrado_em": datetime.now(timezone.utc).isoformat(),
+            **registro,
+        }
+        try:
+            self._fila.put(registro, timeout=TIMEOUT_REGISTRO)
+        except queue.Full:
+            raise AuditoriaIndisponivel("Fila de auditoria cheia.")
+
+    def _gravar(self, lote: list[dict[str, Any]]) -> None:
+        # sem consumir a fila enquanto o disco falha: a fila enche e quem
+        # registra recebe AuditoriaIndisponivel em vez de perder registros
+        while True:
+            try:
+                gravar_lote(lote, self.diretorio, self._segmento)
+                return
+            except OSError:
+                if time.monotonic() >= self._desistir_em:
+                    logger.exception(
+                        "auditoria: %d registros descartados no encerramento",
+                        len(lote),
+                    )
+                    return
+                time.sleep(self.intervalo)
+            except Exception:
+                if len(lote) == 1:
+                    logger.exception("auditoria: registro descartado: %r", lote[0])
+                    return
+                break
+        # nada foi gravado: regrava um a um para descartar só os inválidos
+        for registro in lote:
+            self._gravar([registro])
+
+    def _executar(self) -> None:
+        lote: list[dict[str, Any]] = []
+        prazo = float("inf")
+        while True:
+            espera = max(0.0, prazo - time.monotonic()) if lote else None
+            try:
+                item = self._fila.get(timeout=espera)
+            except queue.Empty:
+                item = None
+            fim = item is _FIM
+            if item is not None and not fim:
+                if not lote:
+                    prazo = time.monotonic() + self.intervalo
+                lote.append(item)
+            if lote and (item is None or fim or len(lote) >= self.tamanho_lote):
+                self._gravar(lote)
+                lote = []
+                prazo = float("inf")
+            if fim:
+                return
+
+
+def _descomprimir_membro(dados: bytes, inicio: int) -> tuple[bytes, int]:
+    """Decompress the gzip member at ``inicio``; returns it and its end offset."""
+    descompressor = zlib.decompressobj(wbits=31)
+    partes: list[bytes] = []
+    pos = inicio
+    while not descompressor.eof:
+        if pos >= len(dados):
+            raise zlib.error("membro incompleto")
+        bloco = dados[pos : pos + TAMANHO_LEITURA]
+        partes.append(descompressor.decompress(bloco))
+        pos += len(bloco)
+    return b"".join(partes), pos - len(descompressor.unused_data)
+
+
+def _ler_membros(caminho: str) -> Iterator[bytes]:
+    """Yield the decompressed gzip members of a file, skipping damaged ones.
+
+    A damaged member (torn write, corrupted bytes) is logged and reading
+    resumes at the next gzip header.
+    """
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    inicio = 0
+    while inicio < len(dados):
+        try:
+            membro, fim = _descomprimir_membro(dados, inicio)
+        except zlib.error as e:
+            logger.warning(
+                "auditoria: membro danificado em %s (byte %d): %s", caminho, inicio, e
+            )
+            inicio = dados.find(b"\x1f\x8b\x08", inicio + 1)
+            if inicio < 0:
+                return
+            continue
+        yield membro
+        inicio = fim
+
+
+def _ler_segmento(caminho: str) -> Iterator[dict[str, Any]]:
+    for membro in _ler_membros(caminho):
+        for linha in membro.decode("utf-8").splitlines():
+            yield json.loads(linha)
+
+
+def reproduzir(
+    inicio: datetime, fim: datetime, diretorio: str = AUDITORIA_DIR
+) -> Iterator[dict[str, Any]]:
+    """Yield the audit records registered in [inicio, fim), oldest day first.
+
+    The segments of a day are merged by ``registrado_em``. ``inicio`` and
+    ``fim`` must be timezone-aware (records are stored in UTC).
+    """
+    if not os.path.isdir(diretorio):
+        return
+    por_dia: dict[date, list[str]] = {}
+    for nome in sorted(os.listdir(diretorio)):
+        if not (nome.startswith(PREFIXO) and nome.endswith(SUFIXO)):
+            continue
+        dia = date.fromisoformat(nome[len(PREFIXO) : len(PREFIXO) + 10])
+        if (
+            inicio.astimezone(timezone.utc).date()
+            <= dia
+            <= fim.astimezone(timezone.utc).date()
+        ):
+            por_dia.setdefault(dia, []).append(os.path.join(diretorio, nome))
+    for dia in sorted(por_dia):
+        segmentos = [_ler_segmento(caminho) for caminho in por_dia[dia]]
+        for registro in heapq.merge(
+            *segmentos, key=lambda r: datetime.fromisoformat(r["registrado_em"])
+        ):
+            if inicio <= datetime.fromisoformat(registro["registrado_em"]) < fim:
+                yield registro
+
+
+def _reconstruir_bloco(
+    registros: list[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    distribuicao: dict[str, int] = registros[0]["distribuicao"]
+    contas = np.array(
+        [
+            [
+                r["entrada"]["valor_fixo"],
+                r["entrada"]["valor_variavel"],
+                r["entrada"]["recursos_hidr_agua"],
+                r["entrada"]["recursos_hidr_esg"],
+            ]
+            for r in registros
+        ],
+        dtype=float,
+    )
+    lote = ratear_lote(np.array(list(distribuicao.values())), contas)
+    for i, registro in enumerate(registros):
+        yield {
+            **registro,
+            "resultado": {
+                "valor_fixo_corrigido": float(lote["valor_fixo_corrigido"][i]),
+                "valor_variavel_por_residente": float(
+                    lote["valor_variavel_por_residente"][i]
+                ),
+                "detalhes_por_apartamento": dict(
+                    zip(distribuicao, lote["detalhes"][i].tolist())
+                ),
+                "total_arrecadado": float(lote["total_arrecadado"][i]),
+                "valor_total_da_conta": float(lote["valor_total_da_conta"][i]),
+            },
+        }
+
+
+def reconstruir(
+    inicio: datetime, fim: datetime, diretorio: str = AUDITORIA_DIR
+) -> Iterator[dict[str, Any]]:
+    """Recompute the splits of a period from the logged inputs and distribution.
+
+    Consecutive records with the same distribution are split together with
+    ratear_lote(); the results match calcular_conta_agua().
+    """
+    bloco: list[dict[str, Any]] = []
+    for registro in reproduzir(inicio, fim, diretorio):
+        if bloco and (
+            registro["distribuicao"] != bloco[0]["distribuicao"]
+            or len(bloco) >= TAMANHO_LOTE_RECONSTRUCAO
+        ):
+            yield from _reconstruir_bloco(bloco)
+            bloco = []
+        bloco.append(registro)
+    if bloco:
+        yield from _reconstruir_bloco(bloco)
+
+
+gravador = GravadorAuditoria()
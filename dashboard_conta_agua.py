@@ -1,23 +1,24 @@
+import io
 import json
 import os
-from typing import Dict, TypedDict
 
 import bcrypt
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
-# TypedDict for calculation result
-class CalculoResult(TypedDict):
-    df: 'pd.DataFrame'
-    valor_fixo_corrigido: float
-    valor_variavel_por_residente: float
-    total_arrecadado: float
-    valor_total_da_conta: float
-    total_residentes: int
-
-
-
+from anomalias import carregar_historico, detectar_anomalias
+from extratos import Extrato, gerar_extratos
+from graficos import (
+    LIMITE_BARRAS,
+    grafico_barras,
+    grafico_pizza,
+    grafico_ranking,
+    grafico_visao_geral,
+    total_paginas,
+)
+from importacao import Importacao, importar_arquivo
+from portfolio import PORTFOLIO_DB, carregar_resumos
+from tabela_rateio import CalculoResult, calcular
 
 st.set_page_config(page_title="Dashboard: Conta de Água", layout="wide", page_icon="💧")
 
@@ -25,34 +26,50 @@ CONFIG_FILE = "config.json"
 
 
 # ---------------------- Helpers ----------------------
-def parse_float(text: str, default: float = 0.0) -> float:
-    """Safely parse a float from text (accepts comma as decimal)."""
-    if not isinstance(text, str):
-        return default
-    t = text.strip().replace("\u00a0", "")
-    t = t.replace(",", ".")
-    try:
-        return float(t)
-    except Exception:
-        return default
+def format_currency(value: float) -> str:
+    return f"R$ {value:.2f}"
 
 
-def to_positive_int(val: object) -> int | None:
-    """Try to convert val to a non-negative int. Return None if invalid."""
-    try:
-        if isinstance(val, int):
-            v = val
-        else:
-            v = int(str(val).strip())
-        if v >= 0:
-            return v
-    except Exception:
-        return None
-    return None
+@st.cache_data(show_spinner=False)
+def analisar_historico(
+    conteudo: bytes, janela: int, limiar: float
+) -> dict[str, pd.DataFrame]:
+    """Parse an uploaded history CSV and flag anomalies (cached per upload)."""
+    historico = carregar_historico(io.BytesIO(conteudo))
+    return detectar_anomalias(historico, janela, limiar)
+
+
+@st.cache_data(show_spinner=False)
+def zip_extratos(df: pd.DataFrame) -> bytes:
+    """Statements ZIP for a result table (cached per result)."""
+    buffer = io.BytesIO()
+    # renderização inline: nada de pool de processos dentro do servidor Streamlit
+    gerar_extratos(
+        [
+            Extrato(
+                predio="condominio",
+                apartamento=str(row["Apartamento"]),
+                moradores=int(row["Moradores"]),
+                valor=float(row["Valor Total (R$)"]),
+            )
+            for row in df.to_dict("records")
+        ],
+        buffer,
+        workers=1,
+    )
+    return buffer.getvalue()
 
 
-def format_currency(value: float) -> str:
-    return f"R$ {value:.2f}"
+@st.cache_data(show_spinner=False)
+def resumos_portfolio(mtime: float) -> pd.DataFrame:
+    """Precomputed building summaries; mtime invalidates the cache on refresh."""
+    return carregar_resumos()
+
+
+@st.cache_data(show_spinner=False)
+def importar_apartamentos(conteudo: bytes, nome_arquivo: str) -> Importacao:
+    """Parse an uploaded apartment file once per distinct upload."""
+    return importar_arquivo(conteudo, nome_arquivo)
 
 
 # Função para carregar dados de usuários
@@ -121,8 +138,10 @@ if st.sidebar.button("🚪 Logout"):
 # Se autenticado
 st.success(f"Bem-vindo, {st.session_state['usuario']}!")
 
-# Cadastro de novo usuário (somente para admin)
-if st.session_state["usuario"] == "admin":
+
+# Painel de administração (fragmento: ações aqui não reexecutam o restante)
+@st.fragment
+def painel_admin() -> None:
     with st.expander("➕ Cadastrar novo usuário"):
         novo_usuario = st.text_input("Novo usuário")
         nova_senha = st.text_input("Nova senha", type="password")
@@ -142,13 +161,21 @@ if st.session_state["usuario"] == "admin":
             st.info("Nenhum usuário encontrado.")
 
 
+# Cadastro de novo usuário (somente para admin)
+if st.session_state["usuario"] == "admin":
+    painel_admin()
+
+
 # Sidebar – Configuração de moradores
 st.sidebar.header("🏢 Apartamentos")
 modo_lista = st.sidebar.radio(
     "Como deseja definir os apartamentos?",
-    ["Gerar automaticamente", "Importar de JSON"],
+    ["Gerar automaticamente", "Importar de JSON", "Importar arquivo"],
 )
 
+# preenchida apenas no modo "Importar arquivo", que já traz os moradores
+distribuicao_importada: dict[str, int] | None = None
+
 match modo_lista:
     case "Gerar automaticamente":
         num_apts = st.sidebar.number_input(
@@ -167,11 +194,47 @@ match modo_lista:
         except Exception:
             st.sidebar.error("Formato inválido. Forneça uma lista JSON válida.")
             apartamentos = []
+    case "Importar arquivo":
+        apartamentos = []
+        arquivo = st.sidebar.file_uploader(
+            "Arquivo com Apartamento, Moradores e Prédio (opcional):",
+            type=["csv", "json", "ndjson", "jsonl", "xlsx"],
+        )
+        if arquivo is not None:
+            try:
+                importacao = importar_apartamentos(arquivo.getvalue(), arquivo.name)
+            except (ValueError, UnicodeDecodeError) as e:
+                st.sidebar.error(f"Não foi possível ler o arquivo: {e}")
+            else:
+                predios = sorted({a["predio"] for a in importacao["apartamentos"]})
+                predio = (
+                    st.sidebar.selectbox("Prédio:", predios)
+                    if len(predios) > 1
+                    else None
+                )
+                distribuicao_importada = {
+                    a["apartamento"]: a["moradores"]
+                    for a in importacao["apartamentos"]
+                    if predio is None or a["predio"] == predio
+                }
+                if importacao["erros"]:
+                    with st.sidebar.expander(
+                        f"⚠️ {len(importacao['erros'])} linha(s) ignorada(s)"
+                    ):
+                        st.dataframe(
+                            pd.DataFrame(importacao["erros"]), hide_index=True
+                        )
     case _:
         apartamentos = []
 
 st.sidebar.header("👥 Moradores por Apartamento")
-distribuicao_residentes = {}
+distribuicao_residentes: dict[str, object] = {}
+if distribuicao_importada is not None:
+    distribuicao_residentes = dict(distribuicao_importada)
+    st.sidebar.caption(
+        f"{len(distribuicao_importada)} apartamentos importados, "
+        f"{sum(distribuicao_importada.values())} moradores."
+    )
 for apto in apartamentos:
     valor = st.sidebar.text_input(
         f"{apto}", value="2", placeholder="Digite o número de moradores"
@@ -180,113 +243,11 @@ for apto in apartamentos:
     distribuicao_residentes[apto] = valor
 
 
-# Inputs principais
-st.title("💧 Dashboard de Conta de Água e Esgoto")
-with st.expander("📅 Preencha os dados da conta"):
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        val1 = st.text_input(
-            "Valor de esgoto (fixo)", value="0.00", placeholder="Ex: 150.00"
-        )
-        valor_fixo = parse_float(val1)
-    with col2:
-        val2 = st.text_input(
-            "Valor de água (variável)", value="0.00", placeholder="Ex: 180.50"
-        )
-        valor_variavel = parse_float(val2)
-    with col3:
-        val3 = st.text_input(
-            "Recursos hídricos (água)", value="0.00", placeholder="Ex: 25.00"
-        )
-        recursos_hidr_agua = parse_float(val3)
-    with col4:
-        val4 = st.text_input(
-            "Recursos hídricos (esgoto)", value="0.00", placeholder="Ex: 30.00"
-        )
-        recursos_hidr_esg = parse_float(val4)
-
-
-# Cálculo principal
-def calcular(
-    distrib: dict[str, object],
-    valor_fixo: float,
-    valor_variavel: float,
-    rec_agua: float,
-    rec_esg: float
-) -> CalculoResult:
-    # Convert inputs to valid integers; ignore invalid entries
-    distrib_clean: Dict[str, int] = {}
-    for k, v in distrib.items():
-        iv = to_positive_int(v)
-        if iv is not None:
-            distrib_clean[k] = iv
-
-    n_apts = len(distrib_clean)
-    total = valor_fixo + valor_variavel + rec_agua + rec_esg
-
-    # If there are no valid apartments, return an empty, safe result
-    if n_apts == 0:
-        # explicit empty DataFrame with typed Series avoids static-type warnings
-        empty_df = pd.DataFrame(
-            {
-                "Apartamento": pd.Series(dtype=object),
-                "Moradores": pd.Series(dtype=int),
-                "Valor Total (R$)": pd.Series(dtype=float),
-            }
-        )
-        return CalculoResult(
-            df=empty_df,
-            valor_fixo_corrigido=0.0,
-            valor_variavel_por_residente=0.0,
-            total_arrecadado=0.0,
-            valor_total_da_conta=round(float(total), 2),
-            total_residentes=0,
-        )
-
-    n_residentes = sum(distrib_clean.values())
-
-    v_fixo_base = valor_fixo / n_apts if n_apts > 0 else 0.0
-    v_var_pessoa = valor_variavel / n_residentes if n_residentes > 0 else 0.0
-
-    inicial = sum(v_fixo_base + v_var_pessoa * r for r in distrib_clean.values())
-    ajuste = (total - inicial) / n_apts if n_apts > 0 else 0.0
-    v_fixo_corrigido = v_fixo_base + ajuste
-
-    detalhes = []
-    for apto, moradores in distrib_clean.items():
-        # ensure plain python types so static analysis is happy
-        moradores_int = int(moradores)
-        valor = round(v_fixo_corrigido + moradores_int * v_var_pessoa, 2)
-        valor = float(valor)
-        detalhes.append(
-            {"Apartamento": apto, "Moradores": moradores_int, "Valor Total (R$)": valor}
-        )
-
-    # compute total as a pure python float (avoid incremental += type issues)
-    total_pago = float(sum(d["Valor Total (R$)"] for d in detalhes))
-
-    return CalculoResult(
-        df=pd.DataFrame(detalhes).sort_values("Apartamento"),
-        valor_fixo_corrigido=round(v_fixo_corrigido, 2),
-        valor_variavel_por_residente=round(v_var_pessoa, 2),
-        total_arrecadado=round(float(total_pago), 2),
-        valor_total_da_conta=round(float(total), 2),
-        total_residentes=n_residentes,
-    )
-
-
-if st.button("🚀 Calcular"):
-    resultado = calcular(
-        distribuicao_residentes,
-        valor_fixo,
-        valor_variavel,
-        recursos_hidr_agua,
-        recursos_hidr_esg,
-    )
+def exibir_resultado(resultado: CalculoResult) -> None:
     df = resultado["df"]
     if not isinstance(df, pd.DataFrame):
         st.error("Erro interno: resultado['df'] não é um DataFrame.")
-        st.stop()
+        return
 
     # If result is empty (no valid apartments), show a helpful message
     if isinstance(df, pd.DataFrame) and df.empty:
@@ -322,12 +283,26 @@ if st.button("🚀 Calcular"):
 
         with colg1:
             st.subheader("📊 Valor pago por apartamento")
-            fig_bar = px.bar(df, x="Apartamento", y="Valor Total (R$)", text_auto=True)
+            pagina = 0
+            if len(df) > LIMITE_BARRAS:
+                # muitos apartamentos: visão geral em WebGL + barras paginadas
+                st.plotly_chart(grafico_visao_geral(df), width='stretch')
+                pagina = (
+                    st.number_input(
+                        "Página",
+                        min_value=1,
+                        max_value=total_paginas(len(df)),
+                        value=1,
+                        step=1,
+                    )
+                    - 1
+                )
+            fig_bar = grafico_barras(df, int(pagina))
             st.plotly_chart(fig_bar, width='stretch')
 
         with colg2:
             st.subheader("🥧 Distribuição de moradores")
-            fig_pie = px.pie(df, values="Moradores", names="Apartamento", hole=0.3)
+            fig_pie = grafico_pizza(df)
             st.plotly_chart(fig_pie, width='stretch')
 
         # Download
@@ -339,3 +314,130 @@ if st.button("🚀 Calcular"):
                 file_name="resultado_conta_agua.csv",
                 mime="text/csv",
             )
+
+            # Extratos individuais (um HTML por apartamento) em um único ZIP,
+            # gerados só quando pedidos
+            if st.checkbox("📄 Preparar extratos por apartamento (ZIP)"):
+                st.download_button(
+                    "📄 Baixar extratos por apartamento (ZIP)",
+                    zip_extratos(df),
+                    file_name="extratos_conta_agua.zip",
+                    mime="application/zip",
+                )
+
+
+# Dados da conta + resultados (fragmento: editar a conta recalcula só esta seção)
+@st.fragment
+def secao_calculo(distrib: dict[str, object]) -> None:
+    with st.expander("📅 Preencha os dados da conta"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            val1 = st.text_input(
+                "Valor de esgoto (fixo)", value="0.00", placeholder="Ex: 150.00"
+            )
+        with col2:
+            val2 = st.text_input(
+                "Valor de água (variável)", value="0.00", placeholder="Ex: 180.50"
+            )
+        with col3:
+            val3 = st.text_input(
+                "Recursos hídricos (água)", value="0.00", placeholder="Ex: 25.00"
+            )
+        with col4:
+            val4 = st.text_input(
+                "Recursos hídricos (esgoto)", value="0.00", placeholder="Ex: 30.00"
+            )
+
+    if st.button("🚀 Calcular"):
+        st.session_state["calculado"] = True
+    # after the first click, results follow the inputs without a full rerun
+    if not st.session_state.get("calculado"):
+        return
+
+    resultado = calcular(distrib, val1, val2, val3, val4)
+    exibir_resultado(resultado)
+
+
+# Detecção de anomalias sobre o histórico de contas (fragmento independente)
+@st.fragment
+def secao_anomalias() -> None:
+    with st.expander("🔎 Anomalias de consumo no histórico"):
+        arquivo_hist = st.file_uploader(
+            "Histórico (CSV com Prédio, Período, Apartamento, Valor Total (R$))",
+            type=["csv"],
+        )
+        colh1, colh2 = st.columns(2)
+        janela = colh1.number_input(
+            "Janela (períodos)", min_value=2, max_value=60, value=12, step=1
+        )
+        limiar = colh2.number_input(
+            "Limiar (desvios padrão)", min_value=1.0, max_value=10.0, value=3.0, step=0.5
+        )
+        if arquivo_hist is not None:
+            try:
+                anomalias = analisar_historico(
+                    arquivo_hist.getvalue(), int(janela), float(limiar)
+                )
+            except (ValueError, KeyError) as e:
+                st.error(f"Não foi possível ler o histórico: {e}")
+            else:
+                st.subheader("🏢 Contas fora do padrão (prédio)")
+                if anomalias["predios"].empty:
+                    st.info("Nenhuma anomalia encontrada nas contas dos prédios.")
+                else:
+                    st.dataframe(anomalias["predios"], width='stretch')
+                st.subheader("🏠 Rateios fora do padrão (apartamento)")
+                if anomalias["apartamentos"].empty:
+                    st.info("Nenhuma anomalia encontrada nos apartamentos.")
+                else:
+                    st.dataframe(anomalias["apartamentos"], width='stretch')
+
+
+# Comparação entre prédios a partir dos resumos pré-calculados
+@st.fragment
+def secao_portfolio() -> None:
+    with st.expander("🏙️ Portfólio de prédios"):
+        if not os.path.exists(PORTFOLIO_DB):
+            st.info(
+                "Nenhum resumo disponível. Rode `python portfolio.py` ou "
+                "`python extratos.py -p <período>` após o lote do mês."
+            )
+            return
+        resumos = resumos_portfolio(os.path.getmtime(PORTFOLIO_DB))
+        if resumos.empty:
+            st.info("Nenhum resumo disponível.")
+            return
+
+        metricas = {
+            "Custo por residente": "custo_por_residente",
+            "Custo por apartamento": "custo_por_apartamento",
+            "Valor total": "valor_total",
+        }
+        colp1, colp2, colp3 = st.columns(3)
+        periodos = sorted(resumos["periodo"].unique(), reverse=True)
+        periodo = colp1.selectbox("Período", periodos)
+        metrica = metricas[colp2.selectbox("Ordenar por", list(metricas))]
+        busca = colp3.text_input("Filtrar prédio", placeholder="Nome do prédio")
+
+        selecao = resumos[resumos["periodo"] == periodo]
+        if busca:
+            selecao = selecao[
+                selecao["predio"].str.contains(busca, case=False, regex=False)
+            ]
+        selecao = selecao.sort_values(metrica, ascending=False)
+
+        st.caption(f"{len(selecao)} prédio(s) em {periodo}")
+        st.dataframe(
+            selecao.drop(columns=["periodo", "atualizado_em"]),
+            width='stretch',
+            hide_index=True,
+        )
+        if not selecao.empty:
+            st.plotly_chart(grafico_ranking(selecao, metrica), width='stretch')
+
+
+# Inputs principais
+st.title("💧 Dashboard de Conta de Água e Esgoto")
+secao_calculo(distribuicao_residentes)
+secao_anomalias()
+secao_portfolio()
@@ -0,0 +1,198 @@
+import argparse
+import csv
+import html
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from string import Template
+from typing import Iterable, TypedDict
+
+import pandas as pd
+
+from portfolio import COL_PERIODO, atualizar_resumos
+
+# Colunas do CSV gerado pelo dashboard (coluna "Prédio" é opcional)
+COL_PREDIO = "Prédio"
+COL_APARTAMENTO = "Apartamento"
+COL_MORADORES = "Moradores"
+COL_VALOR = "Valor Total (R$)"
+
+PREDIO_PADRAO = "condominio"
+
+# Abaixo deste número de extratos o custo de subir processos supera o ganho
+LIMIAR_PARALELO = 2000
+
+TEMPLATE_PADRAO = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Extrato de água - $predio / $apartamento</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; }
+td { border: 1px solid #ccc; padding: 0.4em 0.8em; }
+</style>
+</head>
+<body>
+<h1>💧 Extrato da conta de água e esgoto</h1>
+<p>Prédio: <strong>$predio</strong> · Período: <strong>$periodo</strong></p>
+<table>
+<tr><td>Apartamento</td><td>$apartamento</td></tr>
+<tr><td>Moradores</td><td>$moradores</td></tr>
+<tr><td>Valor a pagar</td><td>$valor</td></tr>
+</table>
+</body>
+</html>
+"""
+
+
+class Extrato(TypedDict):
+    predio: str
+    apartamento: str
+    moradores: int
+    valor: float
+
+
+def format_currency(value: float) -> str:
+    return f"R$ {value:.2f}"
+
+
+@lru_cache(maxsize=8)
+def _carregar_template(caminho: str | None, mtime: float) -> Template:
+    """Compile a template once per process; mtime invalidates the cache entry."""
+    if caminho is None:
+        return Template(TEMPLATE_PADRAO)
+    with open(caminho, "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+def obter_template(caminho: str | None = None) -> Template:
+    mtime = os.path.getmtime(caminho) if caminho else 0.0
+    return _carregar_template(caminho, mtime)
+
+
+def ler_csv(linhas: Iterable[str], predio: str = PREDIO_PADRAO) -> list[Extrato]:
+    """Read the dashboard CSV (optionally with a building column) into statements."""
+    extratos: list[Extrato] = []
+    for linha in csv.DictReader(linhas):
+        try:
+            extratos.append(
+                Extrato(
+                    predio=(linha.get(COL_PREDIO) or predio).strip(),
+                    apartamento=str(linha[COL_APARTAMENTO]).strip(),
+                    moradores=int(linha[COL_MORADORES]),
+                    valor=float(linha[COL_VALOR]),
+                )
+            )
+        except (KeyError, TypeError, ValueError):
+            # linhas incompletas ou inválidas não geram extrato
+            continue
+    return extratos
+
+
+def nome_arquivo(extrato: Extrato) -> str:
+    predio = extrato["predio"].replace("/", "_")
+    apto = extrato["apartamento"].replace("/", "_")
+    return f"{predio}/{apto}.html"
+
+
+def renderizar(extrato: Extrato, template: Template, periodo: str) -> str:
+    return template.safe_substitute(
+        predio=html.escape(extrato["predio"]),
+        apartamento=html.escape(extrato["apartamento"]),
+        moradores=extrato["moradores"],
+        valor=format_currency(extrato["valor"]),
+        periodo=html.escape(periodo),
+    )
+
+
+def _renderizar_bloco(
+    bloco: list[Extrato], caminho_template: str | None, periodo: str
+) -> list[tuple[str, bytes]]:
+    # executado nos processos de trabalho: o template fica em cache por processo
+    template = obter_template(caminho_template)
+    return [
+        (nome_arquivo(e), renderizar(e, template, periodo).encode("utf-8"))
+        for e in bloco
+    ]
+
+
+def _dividir(extratos: list[Extrato], n_blocos: int) -> list[list[Extrato]]:
+    tamanho = max(1, -(-len(extratos) // n_blocos))
+    return [extratos[i : i + tamanho] for i in range(0, len(extratos), tamanho)]
+
+
+def gerar_extratos(
+    extratos: list[Extrato],
+    destino: str | io.BytesIO,
+    periodo: str = "",
+    caminho_template: str | None = None,
+    workers: int | None = None,
+) -> int:
+    """Render one HTML statement per apartment into a single ZIP archive.
+
+    Large batches are split into blocks rendered by a process pool; small ones
+    are rendered inline. Returns the number of statements written.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(extratos) >= LIMIAR_PARALELO:
+        # alguns blocos por processo equilibram a carga sem excesso de IPC
+        blocos = _dividir(extratos, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = pool.map(
+                _renderizar_bloco,
+                blocos,
+                [caminho_template] * len(blocos),
+                [periodo] * len(blocos),
+            )
+            arquivos = [arq for bloco in resultados for arq in bloco]
+    else:
+        arquivos = _renderizar_bloco(extratos, caminho_template, periodo)
+
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for nome, conteudo in arquivos:
+            zf.writestr(nome, conteudo)
+    return len(arquivos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Gera extratos por apartamento a partir do CSV do dashboard."
+    )
+    parser.add_argument("csv", nargs="+", help="CSV(s) de resultado do dashboard")
+    parser.add_argument("-o", "--saida", default="extratos.zip")
+    parser.add_argument("-p", "--periodo", default="")
+    parser.add_argument("-t", "--template", default=None, help="Template HTML")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    extratos: list[Extrato] = []
+    for caminho in args.csv:
+        # sem coluna "Prédio", o nome do arquivo identifica o prédio
+        predio = os.path.splitext(os.path.basename(caminho))[0]
+        with open(caminho, "r", encoding="utf-8", newline="") as f:
+            extratos.extend(ler_csv(f, predio))
+
+    total = gerar_extratos(
+        extratos, args.saida, args.periodo, args.template, args.workers
+    )
+    print(f"{total} extratos gravados em {args.saida}")
+
+    if args.periodo:
+        # lote fechado: atualiza os resumos do portfólio para este período
+        linhas = pd.DataFrame(
+            {
+                COL_PREDIO: [e["predio"] for e in extratos],
+                COL_PERIODO: args.periodo,
+                COL_APARTAMENTO: [e["apartamento"] for e in extratos],
+                COL_MORADORES: [e["moradores"] for e in extratos],
+                COL_VALOR: [e["valor"] for e in extratos],
+            }
+        )
+        print(f"{atualizar_resumos(linhas)} resumos do portfólio atualizados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+COL_APARTAMENTO = "Apartamento"
+COL_MORADORES = "Moradores"
+COL_VALOR = "Valor Total (R$)"
+
+# Acima destes limites os gráficos passam para o modo de muitos apartamentos,
+# mantendo o payload enviado ao navegador limitado
+LIMITE_BARRAS = 50
+LIMITE_FATIAS = 12
+LIMITE_PONTOS = 2000
+
+
+def andar(apto: object) -> str:
+    """Floor label from an apartment ID ("101" -> "Andar 1", "02" -> "Térreo")."""
+    digitos = "".join(c for c in str(apto) if c.isdigit())
+    if len(digitos) < 3:
+        return "Térreo"
+    return f"Andar {int(digitos[:-2])}"
+
+
+def _por_andar(df: pd.DataFrame, max_fatias: int) -> pd.Series | None:
+    # só agrupa quando os IDs codificam o andar (maioria com 3+ dígitos, como
+    # "101"); IDs sequenciais ("01" a "100") cairiam quase todos em "Térreo"
+    digitos = df[COL_APARTAMENTO].map(lambda a: sum(c.isdigit() for c in str(a)))
+    if (digitos >= 3).mean() <= 0.5:
+        return None
+    grupos = df.groupby(df[COL_APARTAMENTO].map(andar), sort=False)[COL_MORADORES]
+    if not 1 < grupos.ngroups <= max_fatias or (grupos.size() < 2).any():
+        return None
+    return grupos.sum()
+
+
+def total_paginas(n_linhas: int, por_pagina: int = LIMITE_BARRAS) -> int:
+    return max(1, -(-n_linhas // por_pagina))
+
+
+def grafico_barras(
+    df: pd.DataFrame, pagina: int = 0, por_pagina: int = LIMITE_BARRAS
+) -> go.Figure:
+    """Bar chart of the amount per apartment, one page of bars at a time."""
+    inicio = pagina * por_pagina
+    return px.bar(
+        df.iloc[inicio : inicio + por_pagina],
+        x=COL_APARTAMENTO,
+        y=COL_VALOR,
+        text_auto=True,
+    )
+
+
+def _reduzir(valores: np.ndarray, max_pontos: int) -> np.ndarray:
+    # min/max por bucket: reduz o número de pontos sem esconder os picos
+    if len(valores) <= max_pontos:
+        return np.arange(len(valores))
+    limites = np.linspace(0, len(valores), max_pontos // 2 + 1).astype(int).tolist()
+    indices: list[int] = []
+    for ini, fim in zip(limites[:-1], limites[1:]):
+        bloco = valores[ini:fim]
+        indices.extend(sorted({ini + int(bloco.argmin()), ini + int(bloco.argmax())}))
+    return np.asarray(indices)
+
+
+def grafico_visao_geral(
+    df: pd.DataFrame, max_pontos: int = LIMITE_PONTOS
+) -> go.Figure:
+    """WebGL overview of every apartment, downsampled to at most max_pontos."""
+    valores = df[COL_VALOR].to_numpy()
+    amostra = df.iloc[_reduzir(valores, max_pontos)]
+    fig = go.Figure(
+        go.Scattergl(
+            x=amostra[COL_APARTAMENTO].astype(str),
+            y=amostra[COL_VALOR],
+            mode="markers",
+        )
+    )
+    fig.update_layout(xaxis_title=COL_APARTAMENTO, yaxis_title=COL_VALOR)
+    fig.update_xaxes(showticklabels=len(amostra) <= LIMITE_BARRAS)
+    return fig
+
+
+def grafico_pizza(df: pd.DataFrame, max_fatias: int = LIMITE_FATIAS) -> go.Figure:
+    """Residents pie chart; large buildings are grouped by floor or into "Outros"."""
+    if len(df) <= max_fatias:
+        return px.pie(df, values=COL_MORADORES, names=COL_APARTAMENTO, hole=0.3)
+
+    por_andar = _por_andar(df, max_fatias)
+    if por_andar is not None:
+        dados = por_andar.rename_axis("Grupo").reset_index()
+    else:
+        moradores = pd.Series(
+            df[COL_MORADORES].to_numpy(), index=df[COL_APARTAMENTO].to_numpy()
+        )
+        ordenado = moradores.sort_values(ascending=False)
+        dados = (
+            pd.concat(
+                [
+                    ordenado.iloc[: max_fatias - 1],
+                    pd.Series({"Outros": ordenado.iloc[max_fatias - 1 :].sum()}),
+                ]
+            )
+            .rename_axis("Grupo")
+            .reset_index(name=COL_MORADORES)
+        )
+    return px.pie(dados, values=COL_MORADORES, names="Grupo", hole=0.3)
+
+
+def grafico_ranking(
+    resumos: pd.DataFrame, metrica: str, limite: int = LIMITE_BARRAS
+) -> go.Figure:
+    """Bar chart of the first ``limite`` buildings of an already sorted ranking."""
+    return px.bar(resumos.head(limite), x="predio", y=metrica, text_auto=True)
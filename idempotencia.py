@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+TTL_PADRAO = 300.0
+MAX_ITENS_PADRAO = 1024
+
+
+class ConflitoIdempotencia(Exception):
+    """The same idempotency key was reused with a different request body."""
+
+
+@dataclass
+class _Entrada(Generic[T]):
+    impressao: str
+    pronto: threading.Event = field(default_factory=threading.Event)
+    resultado: T | None = None
+    erro: BaseException | None = None
+    expira_em: float = float("inf")
+
+
+class CacheIdempotencia(Generic[T]):
+    """Recent responses keyed by idempotency key, with in-flight coalescing.
+
+    The first caller for a key computes the response; concurrent callers with
+    the same key wait for that result instead of computing it again. Finished
+    responses are kept for ``ttl`` seconds (LRU-bounded to ``max_itens``).
+    Failures are not cached.
+    """
+
+    def __init__(self, ttl: float = TTL_PADRAO, max_itens: int = MAX_ITENS_PADRAO):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._entradas: OrderedDict[str, _Entrada[T]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter_ou_calcular(
+        self, chave: str, impressao: str, calcular: Callable[[], T]
+    ) -> tuple[T, bool]:
+        """Return (response, replayed) for ``chave``, computing it at most once."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada.expira_em <= time.monotonic():
+                del self._entradas[chave]
+                entrada = None
+            if entrada is not None:
+                if entrada.impressao != impressao:
+                    raise ConflitoIdempotencia(chave)
+                self._entradas.move_to_end(chave)
+                lider = False
+            else:
+                entrada = _Entrada(impressao)
+                self._entradas[chave] = entrada
+                lider = True
+
+        if not lider:
+            entrada.pronto.wait()
+            if entrada.erro is not None:
+                raise entrada.erro
+            # pyrefly: ignore  # bad-return
+            return entrada.resultado, True
+
+        try:
+            resultado = calcular()
+            entrada.resultado = resultado
+        except BaseException as e:
+            entrada.erro = e
+            with self._lock:
+                if self._entradas.get(chave) is entrada:
+                    del self._entradas[chave]
+            raise
+        finally:
+            entrada.pronto.set()
+
+        with self._lock:
+            entrada.expira_em = time.monotonic() + self.ttl
+            self._despejar()
+        return resultado, False
+
+    def _despejar(self) -> None:
+        """Drop expired entries, then the least recently used finished ones.
+
+        In-flight entries are skipped (their callers are still waiting on
+        them), so only they can keep the cache above ``max_itens``.
+        """
+        agora = time.monotonic()
+        excesso = len(self._entradas) - self.max_itens
+        for chave, entrada in list(self._entradas.items()):
+            if not entrada.pronto.is_set():
+                continue
+            if entrada.expira_em <= agora or excesso > 0:
+                del self._entradas[chave]
+                excesso -= 1
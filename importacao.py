@@ -0,0 +1,180 @@
+import codecs
+import csv
+import io
+import json
+import os
+import zipfile
+from typing import IO, Iterable, Iterator, TypedDict
+
+PREDIO_PADRAO = "condominio"
+MORADORES_PADRAO = 2
+
+# Nomes aceitos para cada coluna (comparados em minúsculas)
+COLUNAS = {
+    "apartamento": {"apartamento", "apto", "apt", "unidade", "id"},
+    "moradores": {"moradores", "residentes", "residents"},
+    "predio": {"prédio", "predio", "edifício", "edificio", "building", "building_id"},
+}
+
+
+class LinhaImportada(TypedDict):
+    predio: str
+    apartamento: str
+    moradores: int
+
+
+class ErroLinha(TypedDict):
+    linha: int
+    mensagem: str
+
+
+class Importacao(TypedDict):
+    apartamentos: list[LinhaImportada]
+    erros: list[ErroLinha]
+
+
+def _normalizar_colunas(registro: dict[str, object]) -> dict[str, object]:
+    normalizado: dict[str, object] = {}
+    for nome, valor in registro.items():
+        chave = str(nome).strip().lower()
+        for coluna, aliases in COLUNAS.items():
+            if chave in aliases:
+                normalizado[coluna] = valor
+    return normalizado
+
+
+def _validar(registro: dict[str, object]) -> LinhaImportada:
+    """Validate one normalized row; raises ValueError with a readable message."""
+    apto = registro.get("apartamento")
+    if apto is None or str(apto).strip() == "":
+        raise ValueError("apartamento não informado")
+
+    moradores = registro.get("moradores")
+    if moradores is None or str(moradores).strip() == "":
+        n_moradores = MORADORES_PADRAO
+    else:
+        try:
+            valor = float(str(moradores).strip().replace(",", "."))
+        except ValueError:
+            valor = -1.0
+        if valor < 0 or not valor.is_integer():
+            raise ValueError(f"número de moradores inválido: {moradores!r}")
+        n_moradores = int(valor)
+
+    predio = registro.get("predio")
+    return LinhaImportada(
+        predio=str(predio).strip() if predio not in (None, "") else PREDIO_PADRAO,
+        apartamento=str(apto).strip(),
+        moradores=n_moradores,
+    )
+
+
+def _linhas_csv(arquivo: IO[bytes]) -> Iterator[tuple[int, dict[str, object]]]:
+    texto = io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+    amostra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.DictReader(texto, dialect=dialeto)
+    try:
+        for registro in leitor:
+            # linha 1 é o cabeçalho
+            yield leitor.line_num, dict(registro)
+    except csv.Error as e:
+        raise ValueError(f"CSV inválido na linha {leitor.line_num}: {e}") from e
+
+
+def _linhas_ndjson(arquivo: IO[bytes]) -> Iterator[tuple[int, object]]:
+    leitor = codecs.getreader("utf-8-sig")(arquivo)
+    for n, linha in enumerate(leitor, start=1):
+        if linha.strip():
+            try:
+                yield n, json.loads(linha)
+            except json.JSONDecodeError as e:
+                yield n, e
+
+
+def _linhas_json(arquivo: IO[bytes]) -> Iterator[tuple[int, object]]:
+    dados = json.load(codecs.getreader("utf-8-sig")(arquivo))
+    if isinstance(dados, dict):
+        if "apartamentos" in dados:
+            dados = dados["apartamentos"]
+        else:
+            # {"101": 2, "102": 3}
+            dados = [{"apartamento": k, "moradores": v} for k, v in dados.items()]
+    if not isinstance(dados, list):
+        raise ValueError("O JSON deve conter uma lista de apartamentos.")
+    yield from enumerate(dados, start=1)
+
+
+def _linhas_excel(arquivo: IO[bytes]) -> Iterator[tuple[int, dict[str, object]]]:
+    # importado só quando necessário: openpyxl é pesado de carregar
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        planilha = load_workbook(arquivo, read_only=True, data_only=True).active
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+        raise ValueError(f"Arquivo Excel inválido: {e}") from e
+    if planilha is None:
+        raise ValueError("planilha vazia")
+    linhas = planilha.iter_rows(values_only=True)
+    cabecalho = [str(c) if c is not None else "" for c in next(linhas, ())]
+    for n, valores in enumerate(linhas, start=2):
+        if any(v is not None for v in valores):
+            yield n, dict(zip(cabecalho, valores))
+
+
+def _registros(arquivo: IO[bytes], nome_arquivo: str) -> Iterable[tuple[int, object]]:
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    match extensao:
+        case ".csv" | ".txt":
+            return _linhas_csv(arquivo)
+        case ".ndjson" | ".jsonl":
+            return _linhas_ndjson(arquivo)
+        case ".json":
+            return _linhas_json(arquivo)
+        case ".xlsx" | ".xlsm":
+            return _linhas_excel(arquivo)
+        case _:
+            raise ValueError(
+                f"Formato de arquivo não suportado: {extensao or nome_arquivo}"
+            )
+
+
+def importar_arquivo(arquivo: IO[bytes] | bytes, nome_arquivo: str) -> Importacao:
+    """Parse an apartment list (CSV, JSON/NDJSON or Excel) row by row.
+
+    Each row needs an apartment ID; residents default to MORADORES_PADRAO and
+    the building ID to PREDIO_PADRAO. Invalid rows are skipped and reported
+    with their line number instead of failing the whole file.
+    """
+    if isinstance(arquivo, bytes):
+        arquivo = io.BytesIO(arquivo)
+
+    resultado = Importacao(apartamentos=[], erros=[])
+    vistos: set[tuple[str, str]] = set()
+    for n, registro in _registros(arquivo, nome_arquivo):
+        if isinstance(registro, Exception):
+            resultado["erros"].append(
+                ErroLinha(linha=n, mensagem=f"JSON inválido: {registro}")
+            )
+            continue
+        if not isinstance(registro, dict):
+            # lista simples de IDs, como em apartamentos.json
+            registro = {"apartamento": registro}
+        try:
+            linha = _validar(_normalizar_colunas(registro))
+        except ValueError as e:
+            resultado["erros"].append(ErroLinha(linha=n, mensagem=str(e)))
+            continue
+        chave = (linha["predio"], linha["apartamento"])
+        if chave in vistos:
+            mensagem = f"apartamento duplicado: {linha['apartamento']}"
+            resultado["erros"].append(ErroLinha(linha=n, mensagem=mensagem))
+            continue
+        vistos.add(chave)
+        resultado["apartamentos"].append(linha)
+    return resultado
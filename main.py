@@ -1,8 +1,37 @@
-from fastapi import FastAPI
+import json
+import math
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from pydantic import BaseModel
+from anomalias import (
+    JANELA_PADRAO,
+    LIMIAR_PADRAO,
+    carregar_historico,
+    detectar_anomalias,
+)
+from auditoria import AuditoriaIndisponivel, gravador
 from calculate import calcular_conta_agua
+from idempotencia import CacheIdempotencia, ConflitoIdempotencia
+from registro import cadastro
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # com o servidor.py o cadastro já vem pré-carregado do processo mestre
+    if not cadastro.carregado:
+        cadastro.carregar()
+    # a thread de auditoria é criada em cada worker, depois do fork
+    gravador.iniciar()
+    yield
+    gravador.encerrar()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Respostas recentes de /calcular-conta, já serializadas
+cache_respostas: CacheIdempotencia[bytes] = CacheIdempotencia()
 
 
 class ContaRequest(BaseModel):
@@ -10,15 +39,114 @@ class ContaRequest(BaseModel):
     valor_variavel: float
     recursos_hidr_agua: float
     recursos_hidr_esg: float
+    predio: str | None = None
+    periodo: str | None = None
 
 
 
 @app.post("/calcular-conta")
-def calcular(request: ContaRequest) -> dict[str, float | dict[str, float]]:
-    resultado = calcular_conta_agua(
+def calcular(
+    request: ContaRequest,
+    idempotency_key: str | None = Header(default=None),
+) -> Response:
+    valores = (
         request.valor_fixo,
         request.valor_variavel,
         request.recursos_hidr_agua,
         request.recursos_hidr_esg,
     )
-    return resultado
+    # NaN/Infinity não são JSON válido na resposta nem no log de auditoria
+    # (validado aqui: o 422 padrão falharia ao ecoar o NaN recebido)
+    if not all(math.isfinite(v) for v in valores):
+        raise HTTPException(
+            status_code=422, detail="Os valores da conta devem ser números finitos."
+        )
+    registro = cadastro.obter()
+    impressao = request.model_dump_json()
+    # sem chave explícita, requisições com o mesmo corpo (e mesmo cadastro)
+    # são coalescidas
+    chave = (
+        f"chave:{idempotency_key}"
+        if idempotency_key
+        else f"corpo:{registro.carregado_em}:{impressao}"
+    )
+
+    def processar() -> bytes:
+        resultado = calcular_conta_agua(
+            request.valor_fixo,
+            request.valor_variavel,
+            request.recursos_hidr_agua,
+            request.recursos_hidr_esg,
+            registro.distribuicao,
+        )
+        # valores enormes podem estourar para inf; nada é registrado nesse caso
+        corpo = json.dumps(resultado, allow_nan=False).encode("utf-8")
+        # registrado antes de responder: todo rateio entregue fica no log
+        gravador.registrar(
+            {
+                "entrada": request.model_dump(),
+                "distribuicao": registro.distribuicao,
+                "resultado": resultado,
+            }
+        )
+        return corpo
+
+    try:
+        corpo, repetida = cache_respostas.obter_ou_calcular(
+            chave, impressao, processar
+        )
+    except ConflitoIdempotencia:
+        raise HTTPException(
+            status_code=409,
+            detail="Idempotency-Key já utilizada com outro corpo de requisição.",
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=422, detail="Valores fora do intervalo representável."
+        )
+    except AuditoriaIndisponivel:
+        raise HTTPException(
+            status_code=503, detail="Auditoria sobrecarregada, tente novamente."
+        )
+    return Response(
+        content=corpo,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true" if repetida else "false"},
+    )
+
+
+@app.get("/anomalias")
+def anomalias(
+    janela: int = Query(JANELA_PADRAO, ge=2),
+    limiar: float = Query(LIMIAR_PADRAO, gt=0),
+) -> dict[str, list[dict[str, Any]]]:
+    try:
+        historico = carregar_historico()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=500, detail=f"Histórico de rateios inválido: {e}"
+        )
+    resultado = detectar_anomalias(historico, janela, limiar)
+    # to_json converte NaN em null
+    return {
+        chave: json.loads(df.to_json(orient="records", force_ascii=False))
+        for chave, df in resultado.items()
+    }
+
+
+@app.get("/saude")
+def saude() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.get("/pronto")
+def pronto() -> dict[str, Any]:
+    if not cadastro.carregado:
+        raise HTTPException(status_code=503, detail="Cadastro ainda não carregado.")
+    registro = cadastro.obter()
+    return {
+        "status": "pronto",
+        "cadastro": registro.origem,
+        "apartamentos": len(registro.distribuicao),
+        "carregado_em": registro.carregado_em,
+    }
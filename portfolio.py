@@ -0,0 +1,174 @@
+import argparse
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from auditoria import reproduzir
+
+# Tabela de resumos por prédio e período, atualizada após cada lote
+PORTFOLIO_DB = os.environ.get("PORTFOLIO_DB", "portfolio.sqlite")
+
+COL_PREDIO = "Prédio"
+COL_PERIODO = "Período"
+COL_APARTAMENTO = "Apartamento"
+COL_MORADORES = "Moradores"
+COL_VALOR = "Valor Total (R$)"
+
+PREDIO_PADRAO = "condominio"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumo_predio (
+    predio TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    apartamentos INTEGER NOT NULL,
+    residentes INTEGER NOT NULL,
+    valor_total REAL NOT NULL,
+    custo_por_apartamento REAL NOT NULL,
+    custo_por_residente REAL,
+    atualizado_em TEXT NOT NULL,
+    PRIMARY KEY (predio, periodo)
+);
+CREATE INDEX IF NOT EXISTS idx_resumo_periodo ON resumo_predio (periodo);
+"""
+
+
+def conectar(caminho: str = PORTFOLIO_DB) -> sqlite3.Connection:
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript(SCHEMA)
+    return conexao
+
+
+def resumir(linhas: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate per-apartment splits into one row per building and period."""
+    resumo = linhas.groupby([COL_PREDIO, COL_PERIODO], as_index=False).agg(
+        apartamentos=(COL_APARTAMENTO, "nunique"),
+        residentes=(COL_MORADORES, "sum"),
+        valor_total=(COL_VALOR, "sum"),
+    )
+    resumo["valor_total"] = resumo["valor_total"].round(2)
+    resumo["custo_por_apartamento"] = (
+        resumo["valor_total"] / resumo["apartamentos"]
+    ).round(2)
+    resumo["custo_por_residente"] = (
+        resumo["valor_total"] / resumo["residentes"].where(resumo["residentes"] > 0)
+    ).round(2)
+    return resumo.rename(columns={COL_PREDIO: "predio", COL_PERIODO: "periodo"})
+
+
+def atualizar_resumos(linhas: pd.DataFrame, caminho: str = PORTFOLIO_DB) -> int:
+    """Refresh the summary rows of every building/period present in ``linhas``.
+
+    ``linhas`` holds the per-apartment splits of a batch (columns Prédio,
+    Período, Apartamento, Moradores, Valor Total (R$)). Each building/period
+    is replaced as a whole. Returns the number of summary rows written.
+    """
+    resumo = resumir(linhas)
+    resumo["atualizado_em"] = datetime.now(timezone.utc).isoformat()
+    colunas = [
+        "predio",
+        "periodo",
+        "apartamentos",
+        "residentes",
+        "valor_total",
+        "custo_por_apartamento",
+        "custo_por_residente",
+        "atualizado_em",
+    ]
+    # NaN (prédio sem residentes) vira NULL
+    registros = [
+        tuple(None if pd.isna(valor) else valor for valor in linha)
+        for linha in resumo[colunas].itertuples(index=False, name=None)
+    ]
+    # uma transação por lote: leitores nunca veem um lote pela metade
+    with closing(conectar(caminho)) as conexao, conexao:
+        conexao.executemany(
+            f"INSERT OR REPLACE INTO resumo_predio ({', '.join(colunas)}) "
+            f"VALUES ({', '.join('?' * len(colunas))})",
+            registros,
+        )
+    return len(resumo)
+
+
+def atualizar_de_auditoria(
+    inicio: datetime, fim: datetime, caminho: str = PORTFOLIO_DB
+) -> int:
+    """Refresh the summaries from the splits recorded in the audit log.
+
+    Bills without ``predio`` count as PREDIO_PADRAO and bills without
+    ``periodo`` use the month they were computed in. When the same building
+    and period were computed more than once, the latest split wins.
+    """
+    ultimos: dict[tuple[str, str], dict] = {}
+    for registro in reproduzir(inicio, fim):
+        entrada = registro["entrada"]
+        predio = entrada.get("predio") or PREDIO_PADRAO
+        periodo = entrada.get("periodo") or registro["registrado_em"][:7]
+        ultimos[(predio, periodo)] = registro
+
+    linhas = [
+        {
+            COL_PREDIO: predio,
+            COL_PERIODO: periodo,
+            COL_APARTAMENTO: apto,
+            COL_MORADORES: registro["distribuicao"].get(apto, 0),
+            COL_VALOR: valor,
+        }
+        for (predio, periodo), registro in ultimos.items()
+        for apto, valor in registro["resultado"]["detalhes_por_apartamento"].items()
+    ]
+    if not linhas:
+        return 0
+    return atualizar_resumos(pd.DataFrame(linhas), caminho)
+
+
+def carregar_resumos(caminho: str = PORTFOLIO_DB) -> pd.DataFrame:
+    """Read every precomputed building/period summary.
+
+    The database is opened read-only: readers never create or alter it.
+    """
+    uri = f"{Path(caminho).resolve().as_uri()}?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as conexao:
+        return pd.read_sql_query(
+            "SELECT * FROM resumo_predio ORDER BY periodo, predio", conexao
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Atualiza os resumos do portfólio de prédios."
+    )
+    parser.add_argument(
+        "csv",
+        nargs="*",
+        help="CSV(s) com Prédio, Período, Apartamento, Moradores e Valor Total (R$)",
+    )
+    parser.add_argument(
+        "--auditoria",
+        metavar="AAAA-MM-DD",
+        nargs=2,
+        help="Reprocessa o log de auditoria de INICIO até FIM (exclusivo, UTC)",
+    )
+    args = parser.parse_args()
+
+    total = 0
+    for caminho in args.csv:
+        # pyrefly: ignore  # no-matching-overload
+        linhas = pd.read_csv(
+            caminho, dtype={COL_PREDIO: str, COL_PERIODO: str, COL_APARTAMENTO: str}
+        )
+        total += atualizar_resumos(linhas)
+    if args.auditoria:
+        inicio, fim = (
+            datetime.fromisoformat(d).replace(tzinfo=timezone.utc)
+            for d in args.auditoria
+        )
+        total += atualizar_de_auditoria(inicio, fim)
+    print(f"{total} resumos atualizados em {PORTFOLIO_DB}")
+
+
+if __name__ == "__main__":
+    main()
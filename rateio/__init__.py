@@ -0,0 +1,13 @@
+from rateio.calculo import Rateio, RateioLote, ratear, ratear_lote
+from rateio.validacao import Conta, parse_float, to_positive_int, validar_conta
+
+__all__ = [
+    "Conta",
+    "Rateio",
+    "RateioLote",
+    "parse_float",
+    "ratear",
+    "ratear_lote",
+    "to_positive_int",
+    "validar_conta",
+]
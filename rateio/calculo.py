@@ -0,0 +1,132 @@
+from typing import TypedDict
+
+import numpy as np
+
+
+class Rateio(TypedDict):
+    valor_fixo_corrigido: float
+    valor_variavel_por_residente: float
+    detalhes: dict[str, float]
+    total_arrecadado: float
+    valor_total_da_conta: float
+    total_residentes: int
+
+
+class RateioLote(TypedDict):
+    valor_fixo_corrigido: np.ndarray
+    valor_variavel_por_residente: np.ndarray
+    detalhes: np.ndarray
+    total_arrecadado: np.ndarray
+    valor_total_da_conta: np.ndarray
+    total_residentes: int
+
+
+def ratear(
+    distribuicao: dict[str, int],
+    valor_fixo: float,
+    valor_variavel: float,
+    recursos_hidr_agua: float,
+    recursos_hidr_esg: float,
+) -> Rateio:
+    """Split one water bill among apartments.
+
+    The sewage (fixed) part is split evenly per apartment and the water
+    (variable) part per resident; the water-resource fees go into the fixed
+    part as an even adjustment, so the apartments pay the whole bill.
+    Per-apartment values are rounded to cents.
+    """
+    total = valor_fixo + valor_variavel + recursos_hidr_agua + recursos_hidr_esg
+    n_apts = len(distribuicao)
+    if n_apts == 0:
+        return Rateio(
+            valor_fixo_corrigido=0.0,
+            valor_variavel_por_residente=0.0,
+            detalhes={},
+            total_arrecadado=0.0,
+            valor_total_da_conta=round(float(total), 2),
+            total_residentes=0,
+        )
+
+    n_residentes = sum(distribuicao.values())
+    v_fixo_base = valor_fixo / n_apts
+    v_var_pessoa = valor_variavel / n_residentes if n_residentes > 0 else 0.0
+
+    inicial = sum(v_fixo_base + v_var_pessoa * r for r in distribuicao.values())
+    v_fixo_corrigido = v_fixo_base + (total - inicial) / n_apts
+
+    detalhes = {
+        apto: round(v_fixo_corrigido + v_var_pessoa * moradores, 2)
+        for apto, moradores in distribuicao.items()
+    }
+    return Rateio(
+        valor_fixo_corrigido=round(v_fixo_corrigido, 2),
+        valor_variavel_por_residente=round(v_var_pessoa, 2),
+        detalhes=detalhes,
+        total_arrecadado=round(float(sum(detalhes.values())), 2),
+        valor_total_da_conta=round(float(total), 2),
+        total_residentes=n_residentes,
+    )
+
+
+def _arredondar(valores: np.ndarray) -> np.ndarray:
+    """Round to cents exactly like the builtin round(x, 2).
+
+    np.round works on x * 100, which can land on the wrong side of a
+    half-cent; only those near-ties go through the builtin.
+    """
+    centavos = valores * 100
+    arredondado = np.round(valores, 2)
+    empate = np.abs(centavos - np.floor(centavos) - 0.5) <= 1e-9 * np.maximum(
+        1.0, np.abs(centavos)
+    )
+    for idx in zip(*np.nonzero(empate)):
+        arredondado[idx] = round(float(valores[idx]), 2)
+    return arredondado
+
+
+def ratear_lote(moradores: np.ndarray, contas: np.ndarray) -> RateioLote:
+    """Split many bills over the same apartments at once.
+
+    ``moradores`` has one resident count per apartment and ``contas`` one row
+    per bill with (valor_fixo, valor_variavel, recursos_hidr_agua,
+    recursos_hidr_esg). Each field has one entry per bill (``detalhes`` is
+    bills x apartments) and matches ratear() to the cent.
+    """
+    por_apto: np.ndarray = np.asarray(moradores, dtype=np.float64)
+    valores: np.ndarray = np.asarray(contas, dtype=np.float64).reshape(-1, 4)
+    n_contas, n_apts = valores.shape[0], por_apto.shape[0]
+    # mesma ordem de soma de ratear(), para os centavos baterem
+    valor_fixo, valor_variavel, recursos_hidr_agua, recursos_hidr_esg = valores.T
+    total = valor_fixo + valor_variavel + recursos_hidr_agua + recursos_hidr_esg
+    if n_apts == 0:
+        return RateioLote(
+            valor_fixo_corrigido=np.zeros(n_contas),
+            valor_variavel_por_residente=np.zeros(n_contas),
+            detalhes=np.zeros((n_contas, 0)),
+            total_arrecadado=np.zeros(n_contas),
+            valor_total_da_conta=_arredondar(total),
+            total_residentes=0,
+        )
+
+    n_residentes = int(por_apto.sum())
+    v_fixo_base = valor_fixo / n_apts
+    v_var_pessoa = (
+        valor_variavel / n_residentes if n_residentes > 0 else np.zeros(n_contas)
+    )
+
+    # cumsum soma em sequência, como sum() em ratear(); np.sum não
+    parcelas = v_fixo_base[:, None] + v_var_pessoa[:, None] * por_apto[None, :]
+    inicial = parcelas.cumsum(axis=1)[:, -1]
+    v_fixo_corrigido = v_fixo_base + (total - inicial) / n_apts
+
+    detalhes = _arredondar(
+        v_fixo_corrigido[:, None] + v_var_pessoa[:, None] * por_apto[None, :]
+    )
+    return RateioLote(
+        valor_fixo_corrigido=_arredondar(v_fixo_corrigido),
+        valor_variavel_por_residente=_arredondar(v_var_pessoa),
+        detalhes=detalhes,
+        total_arrecadado=_arredondar(detalhes.cumsum(axis=1)[:, -1]),
+        valor_total_da_conta=_arredondar(total),
+        total_residentes=n_residentes,
+    )
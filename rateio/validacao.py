@@ -0,0 +1,63 @@
+from typing import Mapping, TypedDict
+
+
+class Conta(TypedDict):
+    distribuicao: dict[str, int]
+    valor_fixo: float
+    valor_variavel: float
+    recursos_hidr_agua: float
+    recursos_hidr_esg: float
+
+
+def parse_float(text: object, default: float = 0.0) -> float:
+    """Safely parse a float from a number or text (accepts comma as decimal)."""
+    if isinstance(text, (int, float)) and not isinstance(text, bool):
+        return float(text)
+    if not isinstance(text, str):
+        return default
+    t = text.strip().replace("\u00a0", "")
+    t = t.replace(",", ".")
+    try:
+        return float(t)
+    except Exception:
+        return default
+
+
+def to_positive_int(val: object) -> int | None:
+    """Try to convert val to a non-negative int. Return None if invalid."""
+    try:
+        if isinstance(val, int):
+            v = val
+        else:
+            v = int(str(val).strip())
+        if v >= 0:
+            return v
+    except Exception:
+        return None
+    return None
+
+
+def validar_conta(
+    distribuicao: Mapping[str, object],
+    valor_fixo: object,
+    valor_variavel: object,
+    recursos_hidr_agua: object,
+    recursos_hidr_esg: object,
+) -> Conta:
+    """Clean raw inputs (form text or API numbers) into a Conta for ratear().
+
+    Apartments whose resident count isn't a non-negative integer are dropped;
+    amounts that can't be parsed count as zero.
+    """
+    distrib_clean: dict[str, int] = {}
+    for apto, moradores in distribuicao.items():
+        n = to_positive_int(moradores)
+        if n is not None:
+            distrib_clean[apto] = n
+    return Conta(
+        distribuicao=distrib_clean,
+        valor_fixo=parse_float(valor_fixo),
+        valor_variavel=parse_float(valor_variavel),
+        recursos_hidr_agua=parse_float(recursos_hidr_agua),
+        recursos_hidr_esg=parse_float(recursos_hidr_esg),
+    )
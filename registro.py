@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from importacao import importar_arquivo
+
+# Cadastro de apartamentos/moradores usado pela API (CSV, JSON ou Excel)
+REGISTRO_FILE = os.environ.get("REGISTRO_FILE", "residentes.json")
+
+# Prédio a usar quando o arquivo de cadastro tem mais de um
+REGISTRO_PREDIO = os.environ.get("REGISTRO_PREDIO")
+
+# Intervalo mínimo entre verificações de alteração do arquivo (segundos)
+INTERVALO_VERIFICACAO = 5.0
+
+# Usado quando não há arquivo de cadastro
+DISTRIBUICAO_PADRAO: dict[str, int] = {
+    "apartamento 01": 3,
+    "apartamento 02": 3,
+    "apartamento 101": 2,
+    "apartamento 102": 2,
+    "apartamento 201": 2,
+    "apartamento 202": 2,
+    "apartamento 301": 1,
+    "apartamento 302": 2,
+}
+
+
+@dataclass(frozen=True)
+class Registro:
+    distribuicao: dict[str, int]
+    origem: str
+    mtime: float
+    carregado_em: float
+
+
+class CadastroApartamentos:
+    """Apartment registry shared by the API workers.
+
+    Loaded once (ideally in the server master, before workers fork) and
+    reloaded in place when the source file changes, so a new registry can be
+    rolled out without restarting the server.
+    """
+
+    def __init__(
+        self, caminho: str = REGISTRO_FILE, predio: str | None = REGISTRO_PREDIO
+    ):
+        self.caminho = caminho
+        self.predio = predio
+        self._registro: Registro | None = None
+        self._verificado_em = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def carregado(self) -> bool:
+        return self._registro is not None
+
+    def _ler(self) -> Registro:
+        if not os.path.exists(self.caminho):
+            return Registro(dict(DISTRIBUICAO_PADRAO), "padrão", 0.0, time.time())
+        mtime = os.path.getmtime(self.caminho)
+        with open(self.caminho, "rb") as f:
+            importacao = importar_arquivo(f, self.caminho)
+        if importacao["erros"]:
+            primeiro = importacao["erros"][0]
+            raise ValueError(
+                f"{self.caminho}, linha {primeiro['linha']}: {primeiro['mensagem']}"
+            )
+        apartamentos = importacao["apartamentos"]
+        if self.predio is not None:
+            apartamentos = [a for a in apartamentos if a["predio"] == self.predio]
+        predios = {a["predio"] for a in apartamentos}
+        if len(predios) > 1:
+            # chaveado só por apartamento, "101" de prédios diferentes colidiria
+            nomes = ", ".join(sorted(predios))
+            raise ValueError(
+                f"{self.caminho}: cadastro com vários prédios ({nomes}); "
+                "defina REGISTRO_PREDIO ou use um arquivo por prédio"
+            )
+        if not apartamentos:
+            raise ValueError(f"{self.caminho}: cadastro sem apartamentos válidos")
+        distribuicao = {a["apartamento"]: a["moradores"] for a in apartamentos}
+        return Registro(distribuicao, self.caminho, mtime, time.time())
+
+    def carregar(self) -> Registro:
+        """(Re)load the registry from disk, replacing the current one atomically."""
+        registro = self._ler()
+        with self._lock:
+            self._registro = registro
+            self._verificado_em = time.monotonic()
+        return registro
+
+    def obter(self) -> Registro:
+        """Return the current registry, reloading it if the file has changed.
+
+        A registry file that fails validation keeps the previous version
+        in service.
+        """
+        registro = self._registro
+        agora = time.monotonic()
+        if registro is not None and agora - self._verificado_em < INTERVALO_VERIFICACAO:
+            return registro
+        with self._lock:
+            self._verificado_em = agora
+        try:
+            mtime = os.path.getmtime(self.caminho)
+        except OSError:
+            mtime = 0.0
+        if registro is None or mtime != registro.mtime:
+            try:
+                registro = self.carregar()
+            except Exception:
+                # arquivo inválido (de qualquer tipo): mantém o cadastro atual
+                if registro is None:
+                    raise
+        return registro
+
+
+cadastro = CadastroApartamentos()
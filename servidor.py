@@ -0,0 +1,73 @@
+import argparse
+import multiprocessing
+import os
+from typing import Any
+
+from fastapi import FastAPI
+from gunicorn.app.base import BaseApplication
+
+from registro import cadastro
+
+
+def workers_padrao() -> int:
+    return int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+
+class ServidorAPI(BaseApplication):
+    """Gunicorn application serving main.app with Uvicorn workers.
+
+    The app is imported and the apartment registry loaded in the master
+    process (preload_app), so forked workers share that memory instead of
+    each one loading its own copy.
+    """
+
+    def __init__(self, opcoes: dict[str, Any]):
+        self.opcoes = opcoes
+        super().__init__()
+
+    # pyrefly: ignore  # bad-override
+    def load_config(self) -> None:
+        for chave, valor in self.opcoes.items():
+            # pyrefly: ignore  # missing-attribute
+            if valor is not None and chave in self.cfg.settings:
+                # pyrefly: ignore  # missing-attribute
+                self.cfg.set(chave, valor)
+
+    # pyrefly: ignore  # bad-override
+    def load(self) -> FastAPI:
+        from main import app
+
+        cadastro.carregar()
+        return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servidor de produção da API.")
+    parser.add_argument(
+        "-b", "--bind", default=os.environ.get("BIND", "0.0.0.0:8000")
+    )
+    parser.add_argument("-w", "--workers", type=int, default=workers_padrao())
+    parser.add_argument(
+        "--timeout", type=int, default=int(os.environ.get("TIMEOUT", "30"))
+    )
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.environ.get("GRACEFUL_TIMEOUT", "30")),
+    )
+    args = parser.parse_args()
+
+    ServidorAPI(
+        {
+            "bind": args.bind,
+            "workers": args.workers,
+            "worker_class": "uvicorn_worker.UvicornWorker",
+            "preload_app": True,
+            "timeout": args.timeout,
+            "graceful_timeout": args.graceful_timeout,
+        }
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from typing import TypedDict
+
+import pandas as pd
+
+from rateio import ratear, validar_conta
+
+
+# TypedDict for calculation result
+class CalculoResult(TypedDict):
+    df: 'pd.DataFrame'
+    valor_fixo_corrigido: float
+    valor_variavel_por_residente: float
+    total_arrecadado: float
+    valor_total_da_conta: float
+    total_residentes: int
+
+
+# Cálculo principal
+def calcular(
+    distrib: dict[str, object],
+    valor_fixo: str,
+    valor_variavel: str,
+    rec_agua: str,
+    rec_esg: str
+) -> CalculoResult:
+    # invalid resident counts are dropped and unparseable amounts count as 0
+    conta = validar_conta(distrib, valor_fixo, valor_variavel, rec_agua, rec_esg)
+    rateio = ratear(**conta)
+
+    # explicit dtypes keep the empty case typed too
+    df = pd.DataFrame(
+        {
+            "Apartamento": pd.Series(list(rateio["detalhes"]), dtype=object),
+            "Moradores": pd.Series(list(conta["distribuicao"].values()), dtype=int),
+            "Valor Total (R$)": pd.Series(
+                list(rateio["detalhes"].values()), dtype=float
+            ),
+        }
+    )
+    return CalculoResult(
+        df=df.sort_values("Apartamento"),
+        valor_fixo_corrigido=rateio["valor_fixo_corrigido"],
+        valor_variavel_por_residente=rateio["valor_variavel_por_residente"],
+        total_arrecadado=rateio["total_arrecadado"],
+        valor_total_da_conta=rateio["valor_total_da_conta"],
+        total_residentes=rateio["total_residentes"],
+    )
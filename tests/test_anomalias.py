@@ -0,0 +1,55 @@
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from anomalias import (
+    COL_APARTAMENTO,
+    COL_PERIODO,
+    COL_PREDIO,
+    COL_VALOR,
+    detectar_anomalias,
+)
+from main import app
+
+
+def historico(valores: dict[str, list[float]]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                COL_PREDIO: "A",
+                COL_PERIODO: f"2025-{i + 1:02d}" if i < 12 else f"2026-{i - 11:02d}",
+                COL_APARTAMENTO: apto,
+                COL_VALOR: valor,
+            }
+            for apto, serie in valores.items()
+            for i, valor in enumerate(serie)
+        ]
+    )
+
+
+def test_historico_constante_seguido_de_salto():
+    # vazamento: valor estável por 12 períodos e depois um salto
+    resultado = detectar_anomalias(
+        historico(
+            {
+                "101": [50.0] * 12 + [500.0],
+                "102": [50.0, 51.0] * 6 + [50.5],
+            }
+        )
+    )
+    apartamentos = resultado["apartamentos"]
+    assert apartamentos[COL_APARTAMENTO].tolist() == ["101"]
+    assert apartamentos["Z-Score"].iloc[0] == float("inf")
+
+
+def test_historico_constante_sem_mudanca_nao_e_anomalia():
+    resultado = detectar_anomalias(historico({"101": [50.0] * 13}))
+    assert resultado["apartamentos"].empty
+    assert resultado["predios"].empty
+
+
+def test_api_historico_sem_colunas(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "historico.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    resposta = TestClient(app).get("/anomalias")
+    assert resposta.status_code == 500
+    assert "Histórico de rateios inválido" in resposta.json()["detail"]
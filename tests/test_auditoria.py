@@ -0,0 +1,41 @@
+import gzip
+import logging
+from datetime import datetime, timedelta, timezone
+
+from auditoria import GravadorAuditoria, arquivo_do_dia, gravar_lote, reproduzir
+
+INICIO = datetime(2026, 9, 1, tzinfo=timezone.utc)
+FIM = INICIO + timedelta(days=1)
+
+
+def registros(primeiro: int, quantidade: int) -> list[dict]:
+    return [
+        {"registrado_em": (INICIO + timedelta(seconds=i)).isoformat(), "n": i}
+        for i in range(primeiro, primeiro + quantidade)
+    ]
+
+
+def test_reproduzir_apos_gravacao_cortada(tmp_path, caplog):
+    diretorio = str(tmp_path)
+    gravar_lote(registros(0, 3), diretorio)
+    # queda no meio da gravação: metade de um membro gzip no fim do arquivo
+    cortado = gzip.compress(b'{"registrado_em":"x"}\n' * 50)
+    with open(arquivo_do_dia(INICIO.date(), diretorio), "ab") as f:
+        f.write(cortado[: len(cortado) // 2])
+    gravar_lote(registros(10, 3), diretorio)
+
+    with caplog.at_level(logging.WARNING, logger="auditoria"):
+        lidos = [r["n"] for r in reproduzir(INICIO, FIM, diretorio)]
+    assert lidos == [0, 1, 2, 10, 11, 12]
+    assert "membro danificado" in caplog.text
+
+
+def test_cada_inicio_grava_em_um_segmento(tmp_path):
+    diretorio = str(tmp_path)
+    for registro in registros(0, 2):
+        gravador = GravadorAuditoria(diretorio, intervalo=0.01)
+        gravador.registrar(registro)
+        gravador.encerrar()
+
+    assert len(list(tmp_path.iterdir())) == 2
+    assert [r["n"] for r in reproduzir(INICIO, FIM, diretorio)] == [0, 1]
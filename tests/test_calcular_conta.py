@@ -0,0 +1,46 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+
+CORPO = (
+    '{"valor_fixo": %s, "valor_variavel": 200.0, '
+    '"recursos_hidr_agua": 1.0, "recursos_hidr_esg": 2.0}'
+)
+
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    # log de auditoria e cadastro relativos ao diretório temporário
+    monkeypatch.chdir(tmp_path)
+    with TestClient(app) as cliente:
+        yield cliente
+
+
+@pytest.mark.parametrize("valor", ["NaN", "Infinity", "-Infinity"])
+def test_valores_nao_finitos_sao_rejeitados(cliente, valor):
+    resposta = cliente.post(
+        "/calcular-conta",
+        content=CORPO % valor,
+        headers={"Content-Type": "application/json"},
+    )
+    assert resposta.status_code == 422
+
+
+def test_estouro_para_infinito_e_rejeitado(cliente):
+    resposta = cliente.post(
+        "/calcular-conta",
+        content=CORPO.replace("200.0", "1.7e308") % "1.7e308",
+        headers={"Content-Type": "application/json"},
+    )
+    assert resposta.status_code == 422
+
+
+def test_valores_finitos(cliente):
+    resposta = cliente.post(
+        "/calcular-conta",
+        content=CORPO % "100.0",
+        headers={"Content-Type": "application/json"},
+    )
+    assert resposta.status_code == 200
+    assert resposta.json()["valor_total_da_conta"] == 303.0
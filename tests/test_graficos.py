@@ -0,0 +1,24 @@
+import pandas as pd
+
+from graficos import COL_APARTAMENTO, COL_MORADORES, grafico_pizza
+
+
+def fatias(apartamentos: list[str]) -> dict[str, int]:
+    df = pd.DataFrame({COL_APARTAMENTO: apartamentos, COL_MORADORES: 2})
+    pizza = grafico_pizza(df).data[0]
+    return dict(zip(pizza.labels, pizza.values))
+
+
+def test_ids_com_andar_agrupam_por_andar():
+    ids = [f"{andar}{apto:02d}" for andar in range(1, 11) for apto in range(1, 5)]
+    grupos = fatias(ids)
+    assert len(grupos) == 10
+    assert grupos["Andar 1"] == 8
+
+
+def test_ids_sequenciais_nao_agrupam_por_andar():
+    # modo "Gerar automaticamente": 01 a 100
+    grupos = fatias([f"{i:02d}" for i in range(1, 101)])
+    assert "Térreo" not in grupos
+    assert len(grupos) == 12
+    assert grupos["Outros"] == 2 * (100 - 11)
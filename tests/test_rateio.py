@@ -0,0 +1,273 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calculate import calcular_conta_agua
+from rateio import parse_float, ratear, ratear_lote, validar_conta
+from registro import DISTRIBUICAO_PADRAO
+from tabela_rateio import calcular
+
+CAMPOS = (
+    "valor_fixo_corrigido",
+    "valor_variavel_por_residente",
+    "total_arrecadado",
+    "valor_total_da_conta",
+)
+
+
+# ---------------------- Algoritmos anteriores (referência) ----------------------
+def calcular_conta_agua_antigo(
+    valor_fixo, valor_variavel, recursos_hidr_agua, recursos_hidr_esg, distribuicao
+):
+    numero_apartamentos = len(distribuicao)
+    numero_residentes = sum(distribuicao.values())
+    total_conta_agua = (
+        valor_fixo + valor_variavel + recursos_hidr_agua + recursos_hidr_esg
+    )
+    valor_fixo_por_apartamento = valor_fixo / numero_apartamentos
+    valor_variavel_por_residente = valor_variavel / numero_residentes
+    total_pago_inicial = sum(
+        valor_fixo_por_apartamento + valor_variavel_por_residente * r
+        for r in distribuicao.values()
+    )
+    diferenca = total_conta_agua - total_pago_inicial
+    ajuste_por_apartamento = diferenca / numero_apartamentos
+    valor_fixo_corrigido = valor_fixo_por_apartamento + ajuste_por_apartamento
+    detalhes = {}
+    total_corrigido = 0.0
+    for apto, moradores in distribuicao.items():
+        valor_total = valor_fixo_corrigido + valor_variavel_por_residente * moradores
+        detalhes[apto] = round(valor_total, 2)
+        total_corrigido += detalhes[apto]
+    return {
+        "valor_fixo_corrigido": round(valor_fixo_corrigido, 2),
+        "valor_variavel_por_residente": round(valor_variavel_por_residente, 2),
+        "detalhes_por_apartamento": detalhes,
+        "total_arrecadado": round(float(total_corrigido), 2),
+        "valor_total_da_conta": round(total_conta_agua, 2),
+    }
+
+
+def parse_float_antigo(text, default=0.0):
+    if not isinstance(text, str):
+        return default
+    t = text.strip().replace("\u00a0", "").replace(",", ".")
+    try:
+        return float(t)
+    except Exception:
+        return default
+
+
+def to_positive_int_antigo(val):
+    try:
+        v = val if isinstance(val, int) else int(str(val).strip())
+        if v >= 0:
+            return v
+    except Exception:
+        return None
+    return None
+
+
+def calcular_antigo(distrib, valor_fixo, valor_variavel, rec_agua, rec_esg):
+    distrib_clean = {}
+    for k, v in distrib.items():
+        iv = to_positive_int_antigo(v)
+        if iv is not None:
+            distrib_clean[k] = iv
+    n_apts = len(distrib_clean)
+    total = valor_fixo + valor_variavel + rec_agua + rec_esg
+    if n_apts == 0:
+        return {
+            "df": pd.DataFrame(
+                {
+                    "Apartamento": pd.Series(dtype=object),
+                    "Moradores": pd.Series(dtype=int),
+                    "Valor Total (R$)": pd.Series(dtype=float),
+                }
+            ),
+            "valor_fixo_corrigido": 0.0,
+            "valor_variavel_por_residente": 0.0,
+            "total_arrecadado": 0.0,
+            "valor_total_da_conta": round(float(total), 2),
+            "total_residentes": 0,
+        }
+    n_residentes = sum(distrib_clean.values())
+    v_fixo_base = valor_fixo / n_apts
+    v_var_pessoa = valor_variavel / n_residentes if n_residentes > 0 else 0.0
+    inicial = sum(v_fixo_base + v_var_pessoa * r for r in distrib_clean.values())
+    v_fixo_corrigido = v_fixo_base + (total - inicial) / n_apts
+    detalhes = [
+        {
+            "Apartamento": apto,
+            "Moradores": int(moradores),
+            "Valor Total (R$)": float(
+                round(v_fixo_corrigido + int(moradores) * v_var_pessoa, 2)
+            ),
+        }
+        for apto, moradores in distrib_clean.items()
+    ]
+    total_pago = float(sum(d["Valor Total (R$)"] for d in detalhes))
+    return {
+        "df": pd.DataFrame(detalhes).sort_values("Apartamento"),
+        "valor_fixo_corrigido": round(v_fixo_corrigido, 2),
+        "valor_variavel_por_residente": round(v_var_pessoa, 2),
+        "total_arrecadado": round(float(total_pago), 2),
+        "valor_total_da_conta": round(float(total), 2),
+        "total_residentes": n_residentes,
+    }
+
+
+# ---------------------- Geradores de entradas ----------------------
+def valor_aleatorio(rng: random.Random) -> float:
+    return round(rng.uniform(0, 5000), 2)
+
+
+def texto_aleatorio(rng: random.Random) -> str:
+    escolha = rng.random()
+    if escolha < 0.1:
+        return rng.choice(["", "abc", "1.2.3", "R$ 10", "nan?"])
+    texto = f"{valor_aleatorio(rng):.2f}"
+    if escolha < 0.5:
+        texto = texto.replace(".", ",")
+    if escolha > 0.9:
+        texto = f"\u00a0{texto} "
+    return texto
+
+
+def distribuicao_aleatoria(rng: random.Random, n_max: int = 60) -> dict[str, int]:
+    return {f"{i:03d}": rng.randint(0, 6) for i in range(rng.randint(1, n_max))}
+
+
+# ---------------------- API: calculate.calcular_conta_agua ----------------------
+def test_calcular_conta_agua_distribuicao_padrao():
+    valores = (120.5, 340.25, 10.0, 5.33)
+    assert calcular_conta_agua(*valores) == calcular_conta_agua_antigo(
+        *valores, DISTRIBUICAO_PADRAO
+    )
+
+
+def test_calcular_conta_agua_igual_ao_algoritmo_antigo():
+    rng = random.Random(34)
+    for _ in range(2000):
+        distribuicao = distribuicao_aleatoria(rng)
+        if sum(distribuicao.values()) == 0:
+            continue
+        fixo, variavel, agua, esgoto = (valor_aleatorio(rng) for _ in range(4))
+        assert calcular_conta_agua(
+            fixo, variavel, agua, esgoto, distribuicao
+        ) == calcular_conta_agua_antigo(fixo, variavel, agua, esgoto, distribuicao)
+
+
+def test_calcular_conta_agua_sem_apartamentos():
+    resultado = calcular_conta_agua(100.0, 50.0, 1.0, 2.0, {})
+    assert resultado["detalhes_por_apartamento"] == {}
+    assert resultado["total_arrecadado"] == 0.0
+    assert resultado["valor_total_da_conta"] == 153.0
+
+
+def test_calcular_conta_agua_sem_residentes():
+    # a parte variável é dividida entre os apartamentos, como no dashboard
+    resultado = calcular_conta_agua(100.0, 50.0, 0.0, 0.0, {"101": 0, "102": 0})
+    assert resultado["valor_variavel_por_residente"] == 0.0
+    assert resultado["detalhes_por_apartamento"] == {"101": 75.0, "102": 75.0}
+    assert resultado["total_arrecadado"] == 150.0
+
+
+# ---------------------- Dashboard: tabela_rateio.calcular ----------------------
+def assert_igual_ao_antigo(distrib: dict[str, object], textos: list[str]):
+    novo = calcular(distrib, *textos)
+    antigo = calcular_antigo(distrib, *(parse_float_antigo(t) for t in textos))
+    pd.testing.assert_frame_equal(novo["df"], antigo["df"], check_index_type=False)
+    for campo in (*CAMPOS, "total_residentes"):
+        assert novo[campo] == antigo[campo], campo
+
+
+def test_calcular_igual_ao_algoritmo_antigo():
+    rng = random.Random(26)
+    for _ in range(500):
+        distrib: dict[str, object] = {
+            apto: str(moradores)
+            for apto, moradores in distribuicao_aleatoria(rng).items()
+        }
+        # contagens inválidas são descartadas
+        for apto in rng.sample(sorted(distrib), k=min(3, len(distrib))):
+            distrib[apto] = rng.choice(["", "x", "-1", "2.5", " 3 "])
+        assert_igual_ao_antigo(distrib, [texto_aleatorio(rng) for _ in range(4)])
+
+
+@pytest.mark.parametrize(
+    "distrib",
+    [
+        {},
+        {"101": "abc", "102": "-2"},
+        {"101": "0", "102": "0"},
+        {"101": 2, "102": "3"},
+    ],
+)
+def test_calcular_casos_limite(distrib):
+    assert_igual_ao_antigo(distrib, ["100,50", "abc", "", "\u00a07,25 "])
+
+
+def test_calcular_sem_apartamentos_validos():
+    resultado = calcular({"101": "x"}, "10", "20", "0", "0")
+    assert resultado["df"].empty
+    assert resultado["valor_total_da_conta"] == 30.0
+
+
+# ---------------------- Validação ----------------------
+@pytest.mark.parametrize(
+    ("texto", "esperado"),
+    [
+        ("12,5", 12.5),
+        (" 1234.56\u00a0", 1234.56),
+        ("abc", 0.0),
+        ("", 0.0),
+        (None, 0.0),
+        (7, 7.0),
+        (2.5, 2.5),
+        (True, 0.0),
+    ],
+)
+def test_parse_float(texto, esperado):
+    assert parse_float(texto) == esperado
+
+
+def test_validar_conta_limpa_entradas():
+    distrib = {"101": "2", "102": "x", "103": -1, "104": 0}
+    conta = validar_conta(distrib, "1,5", 2, "?", None)
+    assert conta == {
+        "distribuicao": {"101": 2, "104": 0},
+        "valor_fixo": 1.5,
+        "valor_variavel": 2.0,
+        "recursos_hidr_agua": 0.0,
+        "recursos_hidr_esg": 0.0,
+    }
+
+
+# ---------------------- Caminho em lote ----------------------
+def assert_lote_igual_escalar(distribuicao: dict[str, int], contas: list[list[float]]):
+    lote = ratear_lote(np.array(list(distribuicao.values())), np.array(contas))
+    for i, conta in enumerate(contas):
+        rateio = ratear(distribuicao, *conta)
+        assert lote["detalhes"][i].tolist() == list(rateio["detalhes"].values())
+        for campo in CAMPOS:
+            assert lote[campo][i] == rateio[campo], campo
+        assert lote["total_residentes"] == rateio["total_residentes"]
+
+
+def test_ratear_lote_igual_ratear():
+    rng = random.Random(35)
+    for _ in range(200):
+        contas = [[valor_aleatorio(rng) for _ in range(4)] for _ in range(50)]
+        assert_lote_igual_escalar(distribuicao_aleatoria(rng, 200), contas)
+
+
+@pytest.mark.parametrize(
+    "distribuicao", [{}, {"101": 0, "102": 0}, {"101": 1}, DISTRIBUICAO_PADRAO]
+)
+def test_ratear_lote_casos_limite(distribuicao):
+    # inclui empates exatos de meio centavo
+    contas = [[0.125, 0.0, 0.0, 0.0], [1.005, 2.675, 0.0, 0.0], [0.0] * 4]
+    assert_lote_igual_escalar(distribuicao, contas)